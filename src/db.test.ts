@@ -1,5 +1,5 @@
 // mcp-server-mssql/src/db.test.ts
-import { connectToDb } from './db.js'; // Add .js
+import { connectToDb, resolveConfig, getPool, closeSharedPool } from './db.js'; // Add .js
 // Removed Profile import
 import * as sql from 'mssql';
 
@@ -47,6 +47,8 @@ describe('Database Connection (db.ts)', () => {
             // For now, only 'connect' seems essential for connectToDb itself.
             // We don't need mocks for close(), request() etc. here unless connectToDb calls them.
             on: mockOnFn, // Add the mocked 'on' method
+            close: jest.fn().mockResolvedValue(undefined),
+            connected: true,
         } as unknown as jest.Mocked<sql.ConnectionPool>;
 
         // Mock the ConnectionPool constructor to return our prepared mock instance
@@ -124,6 +126,74 @@ describe('Database Connection (db.ts)', () => {
          }));
      });
 
+     it('should resolve the config from the current environment', () => {
+         expect(resolveConfig().database).toBe('mock-db');
+
+         process.env.MSSQL_DATABASE = 'other-db';
+         expect(resolveConfig().database).toBe('other-db');
+     });
+
+     it('should connect once and reuse the shared pool across getPool calls', async () => {
+         await closeSharedPool();
+         mockConnectFn.mockResolvedValue(mockPoolInstance);
+
+         const first = await getPool();
+         const second = await getPool();
+
+         expect(first).toBe(mockPoolInstance);
+         expect(second).toBe(first);
+         expect(mockConnectFn).toHaveBeenCalledTimes(1);
+         await closeSharedPool();
+     });
+
+     it('should retry the connection on the next getPool call after a failure', async () => {
+         await closeSharedPool();
+         mockConnectFn.mockRejectedValueOnce(new Error('Connection failed')).mockResolvedValue(mockPoolInstance);
+
+         await expect(getPool()).rejects.toThrow('Connection failed');
+         await expect(getPool()).resolves.toBe(mockPoolInstance);
+         expect(mockConnectFn).toHaveBeenCalledTimes(2);
+         await closeSharedPool();
+     });
+
+     it('should reconnect when the shared pool is no longer connected', async () => {
+         await closeSharedPool();
+         mockConnectFn.mockResolvedValue(mockPoolInstance);
+
+         await getPool();
+         (mockPoolInstance as any).connected = false;
+         await getPool();
+
+         expect(mockConnectFn).toHaveBeenCalledTimes(2);
+         await closeSharedPool();
+     });
+
+     it('should read the pool size from MSSQL_POOL_MAX', () => {
+         process.env.MSSQL_POOL_MAX = '25';
+         expect(resolveConfig().pool).toEqual(expect.objectContaining({ max: 25 }));
+     });
+
+     // [case, environment overrides (undefined removes the variable), expected message fragment]
+     it.each([
+         ['MSSQL_HOST is missing', { MSSQL_HOST: undefined }, 'Missing required environment variables: MSSQL_HOST'],
+         ['user and password are missing', { MSSQL_USER: undefined, MSSQL_PASSWORD: undefined }, 'MSSQL_USER, MSSQL_PASSWORD'],
+         ['MSSQL_PORT is not a number', { MSSQL_PORT: 'abc' }, 'Invalid MSSQL_PORT'],
+         ['MSSQL_POOL_MAX is not a number', { MSSQL_POOL_MAX: 'lots' }, 'Invalid MSSQL_POOL_MAX'],
+         ['MSSQL_POOL_MAX is zero', { MSSQL_POOL_MAX: '0' }, 'Invalid MSSQL_POOL_MAX'],
+     ] as [string, Record<string, string | undefined>, string][])('should reject the config when %s', async (_case, overrides, message) => {
+         for (const [name, value] of Object.entries(overrides)) {
+             if (value === undefined) {
+                 delete process.env[name];
+             } else {
+                 process.env[name] = value;
+             }
+         }
+
+         expect(() => resolveConfig()).toThrow(message);
+         await expect(connectToDb()).rejects.toThrow(message);
+         expect(MockConnectionPool).not.toHaveBeenCalled();
+     });
+
      // Remove test related to profile-based driver logic
      // it('should NOT include driver in config if not present in profile', async () => { ... });
 });
\ No newline at end of file
@@ -2,16 +2,15 @@ import sql from 'mssql';
 // Removed Profile import as it's no longer needed
 import { logger } from './logger.js'; // Add .js
 
-// Consider connection pooling strategy: global pool vs. pool per profile vs. connection per request
-// Global pool might be simplest if connection details don't change often per server instance.
-// For now, let's define a function to create a connection pool on demand.
+// A single shared pool is created lazily on first use and reused by every tool call,
+// so the TCP/TLS handshake and login are paid once per server process rather than per call.
 
 /**
- * Creates and connects an MSSQL connection pool based on environment variables.
- * @returns A connected sql.ConnectionPool instance.
- * @throws Error if connection fails.
+ * Builds the MSSQL connection config from environment variables.
+ * @returns The resolved sql.config object.
+ * @throws Error if required variables are missing or invalid.
  */
-export async function connectToDb(): Promise<sql.ConnectionPool> {
+export function resolveConfig(): sql.config {
     // Read connection details from environment variables
     const host = process.env.MSSQL_HOST;
     const user = process.env.MSSQL_USER;
@@ -21,6 +20,7 @@ export async function connectToDb(): Promise<sql.ConnectionPool> {
     const encryptEnv = process.env.MSSQL_ENCRYPT;
     const trustServerCertificateEnv = process.env.MSSQL_TRUST_SERVER_CERTIFICATE;
     const driver = process.env.MSSQL_DRIVER; // Optional driver
+    const poolMaxEnv = process.env.MSSQL_POOL_MAX;
 
     // Validate required environment variables
     if (!host || !user || !password || !database) {
@@ -40,6 +40,11 @@ export async function connectToDb(): Promise<sql.ConnectionPool> {
         logger.error(`Invalid MSSQL_PORT: ${portEnv}. Must be a number.`);
         throw new Error(`Invalid MSSQL_PORT: ${portEnv}. Must be a number.`);
     }
+    const poolMax = poolMaxEnv ? parseInt(poolMaxEnv, 10) : 10;
+    if (isNaN(poolMax) || poolMax < 1) {
+        logger.error(`Invalid MSSQL_POOL_MAX: ${poolMaxEnv}. Must be a positive number.`);
+        throw new Error(`Invalid MSSQL_POOL_MAX: ${poolMaxEnv}. Must be a positive number.`);
+    }
 
     // Parse encrypt and trustServerCertificate settings
     const encrypt = encryptEnv ? encryptEnv.toLowerCase() === 'true' : false; // Default to false for dev
@@ -47,7 +52,7 @@ export async function connectToDb(): Promise<sql.ConnectionPool> {
 
     logger.info(`Using connection settings: encrypt=${encrypt}, trustServerCertificate=${trustServerCertificate}`);
 
-    const config: sql.config = {
+    return {
         user: user,
         password: password,
         server: host,
@@ -60,11 +65,21 @@ export async function connectToDb(): Promise<sql.ConnectionPool> {
             enableArithAbort: true
         },
         pool: {
-            max: 10, // Example pool configuration
+            max: poolMax, // Connections are validated and reset by the driver on checkout
             min: 0,
             idleTimeoutMillis: 30000
         }
     };
+}
+
+/**
+ * Creates and connects an MSSQL connection pool based on environment variables.
+ * @returns A connected sql.ConnectionPool instance.
+ * @throws Error if connection fails.
+ */
+export async function connectToDb(): Promise<sql.ConnectionPool> {
+    const config = resolveConfig();
+    const { server: host, port, database, user } = config;
 
     logger.info(`Attempting to connect to database: ${database} on server: ${host}:${port} as user: ${user}`);
 
@@ -97,4 +112,50 @@ export async function closePool(pool: sql.ConnectionPool | null): Promise<void>
             logger.error('Error closing database connection pool:', err);
         }
     }
-}
\ No newline at end of file
+}
+
+// Shared connection pool reused across tool calls; created lazily on first use.
+let sharedPool: Promise<sql.ConnectionPool> | null = null;
+
+/**
+ * Returns the shared connection pool, connecting it on first use.
+ * A failed connection attempt is not cached, and a pool that has since been closed
+ * is replaced, so the next call reconnects.
+ * @returns A connected sql.ConnectionPool instance.
+ * @throws Error if connection fails.
+ */
+export async function getPool(): Promise<sql.ConnectionPool> {
+    const pending = sharedPool;
+    if (pending) {
+        const pool = await pending;
+        if (pool.connected) {
+            return pool;
+        }
+        // Only the first caller to notice drops the pool; later ones pick up its replacement
+        if (sharedPool === pending) {
+            logger.warn('Shared connection pool is no longer connected. Reconnecting.');
+            sharedPool = null;
+        }
+    }
+    if (!sharedPool) {
+        const created: Promise<sql.ConnectionPool> = connectToDb().catch(err => {
+            if (sharedPool === created) {
+                sharedPool = null;
+            }
+            throw err;
+        });
+        sharedPool = created;
+    }
+    return sharedPool;
+}
+
+/**
+ * Closes the shared connection pool, if one has been created.
+ */
+export async function closeSharedPool(): Promise<void> {
+    const pending = sharedPool;
+    sharedPool = null;
+    if (pending) {
+        await closePool(await pending.catch(() => null));
+    }
+}
@@ -3,10 +3,13 @@
 import {
     list_tables,
     get_table_schema,
+    describe_database,
     read_table_rows,
     create_table_records,
     update_table_records,
-    delete_table_records
+    delete_table_records,
+    delete_table_records_batch,
+    invalidate_schema_cache
 } from './server.js';
 // Remove profileManager import
 // import * as profileManager from './profileManager.js'; // Add .js
@@ -65,21 +68,36 @@ const mockPool = {
 } as unknown as jest.Mocked<sql.ConnectionPool>;
 // --- End mssql mocks ---
 
+// Asserts that one tool call took a single request from the shared pool and left the pool open
+const expectSharedPoolUsedOnce = () => {
+    expect(mockedDb.getPool).toHaveBeenCalledTimes(1);
+    expect(mockPool.request).toHaveBeenCalledTimes(1);
+    expect(mockPool.close).not.toHaveBeenCalled();
+};
+
+// SQL fragments the generated statements must contain, shared by several tests
+const PAGINATION_SQL = 'OFFSET @offset ROWS FETCH NEXT @fetch ROWS ONLY';
+const ROWCOUNT_SQL = 'SELECT @@ROWCOUNT AS RowsAffected;';
+
 
 describe('MSSQL Tool Functions', () => { // Rename describe block
     // Remove serverInstance variable
     // let serverInstance: MssqlServer;
 
-    beforeEach(() => {
+    beforeEach(async () => {
         jest.clearAllMocks();
+        await invalidate_schema_cache(); // Catalog results are cached across calls
         // Remove serverInstance instantiation
         // serverInstance = new MssqlServer();
-        mockedDb.connectToDb.mockResolvedValue(mockPool);
+        mockedDb.getPool.mockResolvedValue(mockPool);
         mockPool.request.mockReturnValue(mockRequest);
         // Reset specific mock function implementations if needed after clearing
         mockQueryFn.mockClear();
         mockBulkFn.mockClear();
         mockRequest.input.mockClear(); // Clear input calls
+        // Default results, so tests only bind the values they assert on
+        mockQueryFn.mockResolvedValue(DEFAULT_QUERY_RESULT);
+        mockBulkFn.mockResolvedValue({ rowsAffected: 1 } as any);
     });
 
     // Helper to create a valid mock IRecordSet - Defined once for all tests
@@ -91,6 +109,10 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
         return recordset;
     };
 
+    // One row reporting a single affected record, as returned by the UPDATE/DELETE statements
+    const defaultRecordSet = createMockRecordSet([{ RowsAffected: 1 }]);
+    const DEFAULT_QUERY_RESULT: sql.IResult<any> = { recordsets: [defaultRecordSet], recordset: defaultRecordSet, rowsAffected: [1], output: {} };
+
     // --- Tests for list_tables ---
     describe('list_tables', () => {
         // Remove profile_name from args
@@ -109,7 +131,7 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             mockRequest.input.mockClear();
         });
 
-        it('should connect to db, query INFORMATION_SCHEMA.TABLES, and return table names', async () => {
+        it('should connect to db, query sys.tables, and return table names', async () => {
             const mockRecordSet = createMockRecordSet([{ TABLE_NAME: 'Table1' }, { TABLE_NAME: 'Table2' }]);
             const mockTableResult: sql.IResult<any> = {
                 recordsets: [mockRecordSet], // Use recordsets (plural) array
@@ -125,14 +147,11 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             // Remove profile manager checks
             // expect(mockedProfileManager.loadProfiles).toHaveBeenCalledTimes(1);
             // expect(mockedProfileManager.getPassword).toHaveBeenCalledWith(args.profile_name);
-            // Update connectToDb call check (will be updated further in Step 2)
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1); // Check it's called, args check later
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
-            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE'"));
-            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("ORDER BY TABLE_NAME;"));
+            expectSharedPoolUsedOnce();
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("SELECT name AS TABLE_NAME FROM sys.tables"));
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("ORDER BY name;"));
             expect(mockRequest.input).not.toHaveBeenCalled();
             expect(result).toEqual(['Table1', 'Table2']); // Should still extract names correctly
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
         });
 
         it('should include schema filter in query if schema is provided', async () => {
@@ -148,29 +167,27 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
              // Call the imported function directly
              const result = await list_tables(argsWithSchema);
 
-             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("AND TABLE_SCHEMA = @schema"));
+             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("WHERE schema_id = SCHEMA_ID(@schema)"));
              expect(mockRequest.input).toHaveBeenCalledWith('schema', sql.NVarChar, argsWithSchema.schema);
              expect(result).toEqual(['TableDbo']);
-             expect(mockPool.close).toHaveBeenCalledTimes(1);
+             expect(mockPool.close).not.toHaveBeenCalled(); // Shared pool stays open
         });
         // ... other list_tables tests remain the same ...
         // Remove profile/password not found tests for now, will be replaced by env var tests later
         // it('should throw error if profile not found', async () => { ... });
         // it('should throw error if password not found', async () => { ... });
 
-        it('should throw error if connectToDb fails', async () => {
-            const connectError = new Error('DB Connect Failed');
-            mockedDb.connectToDb.mockRejectedValue(connectError);
-            // Call the imported function directly
-            await expect(list_tables(args)).rejects.toThrow('DB Connect Failed');
-             expect(mockPool.close).not.toHaveBeenCalled();
-        });
-        it('should throw error if query fails and close pool', async () => {
-            const queryError = new Error('SQL Query Failed');
-            mockQueryFn.mockRejectedValue(queryError);
-            // Call the imported function directly
-            await expect(list_tables(args)).rejects.toThrow('SQL Query Failed');
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
+        it('should serve repeat calls from the schema cache until it is invalidated', async () => {
+            const mockRecordSet = createMockRecordSet([{ TABLE_NAME: 'Table1' }]);
+            mockQueryFn.mockResolvedValue({ recordsets: [mockRecordSet], recordset: mockRecordSet, rowsAffected: [1], output: {} });
+
+            expect(await list_tables(args)).toEqual(['Table1']);
+            expect(await list_tables(args)).toEqual(['Table1']);
+            expect(mockQueryFn).toHaveBeenCalledTimes(1);
+
+            expect(await invalidate_schema_cache()).toEqual({ status: 'Success', cleared_count: 1 });
+            await list_tables(args);
+            expect(mockQueryFn).toHaveBeenCalledTimes(2);
         });
     });
 
@@ -211,16 +228,13 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             // Call the imported function directly
             const result = await get_table_schema(args);
 
-            // Update connectToDb call check (will be updated further in Step 2)
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1); // Check it's called, args check later
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
+            expectSharedPoolUsedOnce();
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("FROM INFORMATION_SCHEMA.COLUMNS"));
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("WHERE TABLE_NAME = @table_name"));
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("ORDER BY ORDINAL_POSITION;"));
             expect(mockRequest.input).toHaveBeenCalledWith('table_name', sql.NVarChar, args.table_name);
             expect(mockRequest.input).not.toHaveBeenCalledWith('schema', expect.anything(), expect.anything()); // No schema filter
             expect(result).toEqual(mockSchemaResultData);
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
         });
 
         it('should include schema filter if schema is provided', async () => {
@@ -233,27 +247,50 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining("AND TABLE_SCHEMA = @schema"));
             expect(mockRequest.input).toHaveBeenCalledWith('table_name', sql.NVarChar, argsWithSchema.table_name);
             expect(mockRequest.input).toHaveBeenCalledWith('schema', sql.NVarChar, argsWithSchema.schema);
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
+            expect(mockPool.close).not.toHaveBeenCalled(); // Shared pool stays open
         });
 
         // Remove profile/password not found tests for now
         // it('should throw error if profile not found', async () => { ... });
         // it('should throw error if password not found', async () => { ... });
+    });
 
-        it('should throw error if connectToDb fails', async () => {
-            const connectError = new Error('DB Connect Failed');
-            mockedDb.connectToDb.mockRejectedValue(connectError);
-            // Call the imported function directly
-            await expect(get_table_schema(args)).rejects.toThrow('DB Connect Failed');
-            expect(mockPool.close).not.toHaveBeenCalled();
+    describe('describe_database', () => {
+        it('should fetch all columns in one query and group them by table', async () => {
+            const mockRecordSet = createMockRecordSet([
+                { TABLE_SCHEMA: 'dbo', TABLE_NAME: 'Orders', COLUMN_NAME: 'Id', DATA_TYPE: 'int' },
+                { TABLE_SCHEMA: 'dbo', TABLE_NAME: 'Orders', COLUMN_NAME: 'Total', DATA_TYPE: 'decimal' },
+                { TABLE_SCHEMA: 'dbo', TABLE_NAME: 'Users', COLUMN_NAME: 'Id', DATA_TYPE: 'int' },
+            ]);
+            mockQueryFn.mockResolvedValue({ recordsets: [mockRecordSet], recordset: mockRecordSet, rowsAffected: [3], output: {} });
+
+            const result = await describe_database({ schema: 'dbo' });
+
+            expect(mockQueryFn).toHaveBeenCalledTimes(1);
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining('FROM INFORMATION_SCHEMA.COLUMNS c'));
+            expect(mockRequest.input).toHaveBeenCalledWith('schema', sql.NVarChar, 'dbo');
+            expect(result).toEqual({
+                'dbo.Orders': [{ COLUMN_NAME: 'Id', DATA_TYPE: 'int' }, { COLUMN_NAME: 'Total', DATA_TYPE: 'decimal' }],
+                'dbo.Users': [{ COLUMN_NAME: 'Id', DATA_TYPE: 'int' }],
+            });
         });
 
-        it('should throw error if query fails and close pool', async () => {
-            const queryError = new Error('SQL Schema Query Failed');
-            mockQueryFn.mockRejectedValue(queryError);
-            // Call the imported function directly
-            await expect(get_table_schema(args)).rejects.toThrow('SQL Schema Query Failed');
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
+        it('should keep same-named tables in different schemas apart', async () => {
+            const mockRecordSet = createMockRecordSet([
+                { TABLE_SCHEMA: 'dbo', TABLE_NAME: 'Users', COLUMN_NAME: 'Id', DATA_TYPE: 'int' },
+                { TABLE_SCHEMA: 'dbo', TABLE_NAME: 'Users', COLUMN_NAME: 'Name', DATA_TYPE: 'nvarchar' },
+                { TABLE_SCHEMA: 'sales', TABLE_NAME: 'Users', COLUMN_NAME: 'Id', DATA_TYPE: 'bigint' },
+            ]);
+            mockQueryFn.mockResolvedValue({ recordsets: [mockRecordSet], recordset: mockRecordSet, rowsAffected: [3], output: {} });
+
+            const result = await describe_database({});
+
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining('ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION'));
+            expect(mockRequest.input).not.toHaveBeenCalled();
+            expect(result).toEqual({
+                'dbo.Users': [{ COLUMN_NAME: 'Id', DATA_TYPE: 'int' }, { COLUMN_NAME: 'Name', DATA_TYPE: 'nvarchar' }],
+                'sales.Users': [{ COLUMN_NAME: 'Id', DATA_TYPE: 'bigint' }],
+            });
         });
     });
 
@@ -268,6 +305,9 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             { UserID: 2, Name: 'Bob', Age: 25 },
             { UserID: 3, Name: 'Charlie', Age: 35 },
         ];
+        // Shared read-only payloads; the tool never mutates its arguments
+        const NAME_EQUALS_ALICE = { Name: { operator: '=', value: 'Alice' } };
+        const ORDER_BY_USER_ID = { UserID: 'ASC' as const };
 
         // Helper to create mock result for row query
         const createMockReadResult = (records: any[]): sql.IResult<any> => {
@@ -296,16 +336,13 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             // Call the imported function directly
             const result = await read_table_rows(baseArgs);
 
-            // Update connectToDb call check (will be updated further in Step 2)
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1); // Check it's called, args check later
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
+            expectSharedPoolUsedOnce();
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`SELECT * FROM [${baseArgs.table_name}]`));
             // Check it doesn't contain WHERE or ORDER BY or OFFSET/FETCH
             expect(mockQueryFn).not.toHaveBeenCalledWith(expect.stringContaining("WHERE"));
             expect(mockQueryFn).not.toHaveBeenCalledWith(expect.stringContaining("ORDER BY"));
             expect(mockQueryFn).not.toHaveBeenCalledWith(expect.stringContaining("OFFSET"));
             expect(result).toEqual(mockUserData);
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
         });
 
         it('should select specific columns', async () => {
@@ -316,7 +353,7 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
         });
 
         it('should apply simple "=" filter', async () => {
-            const args = { ...baseArgs, filters: { Name: { operator: '=', value: 'Alice' } } };
+            const args = { ...baseArgs, filters: NAME_EQUALS_ALICE };
             // Call the imported function directly
             await read_table_rows(args);
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`WHERE [Name] = @filterParam0`));
@@ -358,39 +395,76 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
         });
 
         it('should apply LIMIT and OFFSET (requires ORDER BY)', async () => {
-            const args = { ...baseArgs, order_by: { UserID: 'ASC' as const }, limit: 1, offset: 1 };
+            const args = { ...baseArgs, order_by: ORDER_BY_USER_ID, limit: 1, offset: 1 };
             // Call the imported function directly
             await read_table_rows(args);
-            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`ORDER BY [UserID] ASC OFFSET 1 ROWS FETCH NEXT 1 ROWS ONLY`));
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`ORDER BY [UserID] ASC ${PAGINATION_SQL}`));
+            expect(mockRequest.input).toHaveBeenCalledWith('offset', sql.Int, 1);
+            expect(mockRequest.input).toHaveBeenCalledWith('fetch', sql.Int, 1);
         });
 
          it('should apply default ORDER BY if pagination used without explicit order', async () => {
              const args = { ...baseArgs, limit: 2 };
              // Call the imported function directly
              await read_table_rows(args);
-             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`ORDER BY (SELECT 1) OFFSET 0 ROWS FETCH NEXT 2 ROWS ONLY`));
+             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`ORDER BY (SELECT 1) ${PAGINATION_SQL}`));
+             expect(mockRequest.input).toHaveBeenCalledWith('offset', sql.Int, 0);
+             expect(mockRequest.input).toHaveBeenCalledWith('fetch', sql.Int, 2);
              expect(logger.warn).toHaveBeenCalledWith(expect.stringContaining('Pagination (limit/offset) used without explicit ORDER BY'));
          });
 
-        it('should handle query errors and close pool', async () => {
-            const queryError = new Error('Read Query Failed');
-            mockQueryFn.mockRejectedValue(queryError);
-            // Call the imported function directly
-            await expect(read_table_rows(baseArgs)).rejects.toThrow('Read Query Failed');
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
+        it('should reuse the same SQL text for repeated query shapes with different values', async () => {
+            await read_table_rows({ ...baseArgs, filters: NAME_EQUALS_ALICE, order_by: ORDER_BY_USER_ID, limit: 1 });
+            await read_table_rows({ ...baseArgs, filters: { Name: { operator: '=', value: 'Bob' } }, order_by: ORDER_BY_USER_ID, limit: 5 });
+            expect(mockQueryFn.mock.calls[0][0]).toBe(mockQueryFn.mock.calls[1][0]);
+            expect(mockRequest.input).toHaveBeenCalledWith('filterParam0', 'Bob');
+            expect(mockRequest.input).toHaveBeenCalledWith('fetch', sql.Int, 5);
+        });
+
+        it.each([
+            ['empty table name', { table_name: '' }],
+            ['overlong table name', { table_name: 'T'.repeat(129) }],
+            ['empty selected column', { ...baseArgs, columns: ['Name', ''] }],
+            ['overlong filter column', { ...baseArgs, filters: { ['C'.repeat(129)]: { operator: '=', value: 1 } } }],
+            ['empty order_by column', { ...baseArgs, order_by: { '': 'ASC' as const } }],
+        ])('should reject an invalid %s without querying', async (_case, args) => {
+            await expect(read_table_rows(args)).rejects.toThrow('Invalid SQL identifier');
+            expect(mockedDb.getPool).not.toHaveBeenCalled(); // Rejected before touching the pool
+            expect(mockQueryFn).not.toHaveBeenCalled();
+        });
+
+        it('should bracket-quote delimited names and escape closing brackets', async () => {
+            await read_table_rows({ table_name: 'Order Details', columns: ['unit-price', 'Users]; DROP TABLE Users;--'] });
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining('SELECT [unit-price], [Users]]; DROP TABLE Users;--] FROM [Order Details]'));
+        });
+
+        it('should cap unbounded reads with TOP when MSSQL_MAX_ROWS is set', async () => {
+            process.env.MSSQL_MAX_ROWS = '2';
+            const warnSpy = jest.spyOn(console, 'warn').mockImplementation(() => {});
+            try {
+                await read_table_rows(baseArgs);
+                expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`SELECT TOP (@top) * FROM [${baseArgs.table_name}]`));
+                expect(mockRequest.input).toHaveBeenCalledWith('top', sql.Int, 2);
+
+                await read_table_rows({ ...baseArgs, order_by: ORDER_BY_USER_ID, limit: 50, offset: 10 });
+                expect(mockQueryFn).toHaveBeenLastCalledWith(expect.stringContaining(PAGINATION_SQL));
+                expect(mockRequest.input).toHaveBeenCalledWith('fetch', sql.Int, 2);
+                // Truncation is never silent
+                expect(warnSpy).toHaveBeenCalledWith(expect.stringContaining('unbounded read on "Users" capped at MSSQL_MAX_ROWS=2'));
+                expect(warnSpy).toHaveBeenCalledWith(expect.stringContaining('limit 50 on "Users" capped at MSSQL_MAX_ROWS=2'));
+
+                warnSpy.mockClear();
+                await read_table_rows({ ...baseArgs, order_by: ORDER_BY_USER_ID, limit: 1 });
+                expect(warnSpy).not.toHaveBeenCalled();
+            } finally {
+                warnSpy.mockRestore();
+                delete process.env.MSSQL_MAX_ROWS;
+            }
         });
 
         // Remove profile/password not found tests for now
         // it('should throw error if profile not found', async () => { ... });
         // it('should throw error if password not found', async () => { ... });
-
-         it('should throw error if connectToDb fails', async () => {
-             const connectError = new Error('DB Connect Failed');
-             mockedDb.connectToDb.mockRejectedValue(connectError);
-             // Call the imported function directly
-             await expect(read_table_rows(baseArgs)).rejects.toThrow('DB Connect Failed');
-             expect(mockPool.close).not.toHaveBeenCalled();
-          });
     });
 
     describe('create_table_records', () => {
@@ -423,9 +497,7 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             // Call the imported function directly
             const result = await create_table_records(args);
 
-            // Update connectToDb call check (will be updated further in Step 2)
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1); // Check it's called, args check later
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
+            expectSharedPoolUsedOnce();
             // Verify bulk was called with a Table object matching the table name
             expect(mockBulkFn).toHaveBeenCalledWith(expect.objectContaining({
                 path: `[${args.table_name}]` // Check table name used in Table object
@@ -440,48 +512,30 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             expect(tableArg.rows[1]).toEqual(['Eve', 22]);
 
             expect(result).toEqual({ status: 'Success', inserted_count: args.records.length });
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
         });
 
         it('should return error if no records are provided', async () => {
             // Call the imported function directly - expect it to throw now
             await expect(create_table_records({ ...args, records: [] })).rejects.toThrow('No records provided to insert.');
             // expect(result).toEqual({ status: 'Error', inserted_count: 0, message: 'No records provided to insert.' });
-            expect(mockedDb.connectToDb).not.toHaveBeenCalled();
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
         });
 
-        it('should handle errors during bulk insert and close pool', async () => {
-            const bulkError = new Error('Bulk insert failed');
-            mockBulkFn.mockRejectedValue(bulkError);
-
-            // The function now returns the error object instead of throwing for create/update/delete
-            // Call the imported function directly - expect it to throw
-            await expect(create_table_records(args)).rejects.toThrow('Bulk insert failed');
-            // const result = await serverInstance.create_table_records(args);
+        it('should throw if records do not share the same columns', async () => {
+            const mismatched = { ...args, records: [{ Name: 'Dave', Age: 40 }, { Name: 'Eve', City: 'Oslo' }] };
+            await expect(create_table_records(mismatched)).rejects.toThrow('Record at index 1 does not have the same columns as the first record.');
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
+        });
 
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1);
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
-            expect(mockBulkFn).toHaveBeenCalledTimes(1);
-            // expect(result.status).toBe('Error');
-            // expect(result.inserted_count).toBe(0);
-            // expect(result.message).toContain('Bulk insert failed'); // Check if error message is included
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
+        it('should reject invalid table or column names before acquiring the pool', async () => {
+            await expect(create_table_records({ ...args, table_name: '' })).rejects.toThrow('Invalid SQL identifier');
+            await expect(create_table_records({ ...args, records: [{ ['C'.repeat(129)]: 'Dave' }] })).rejects.toThrow('Invalid SQL identifier');
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
         });
 
         // Remove profile/password not found tests for now
         // it('should return error if profile not found', async () => { ... });
         // it('should return error if password not found', async () => { ... });
-
-         it('should return error if connectToDb fails', async () => {
-             const connectError = new Error('DB Connect Failed');
-             mockedDb.connectToDb.mockRejectedValue(connectError);
-             // Call the imported function directly - expect it to throw
-             await expect(create_table_records(args)).rejects.toThrow('DB Connect Failed');
-             // const result = await serverInstance.create_table_records(args);
-             // expect(result.status).toBe('Error');
-             // expect(result.message).toContain('DB Connect Failed');
-             expect(mockPool.close).not.toHaveBeenCalled(); // connectToDb failed before pool could be closed
-         });
     });
 
     describe('update_table_records', () => {
@@ -504,32 +558,20 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
         });
 
         it('should connect, build UPDATE query, execute, and return updated count', async () => {
-            // Mock the result for @@ROWCOUNT
-            const mockRecordSet = createMockRecordSet([{ RowsAffected: 1 }]); // Use helper
-            const mockUpdateResult: sql.IResult<any> = {
-                recordsets: [mockRecordSet], // Use helper result
-                recordset: mockRecordSet,   // Use helper result
-                rowsAffected: [], // Not directly relevant for SELECT @@ROWCOUNT
-                output: {},
-            };
-            mockQueryFn.mockResolvedValue(mockUpdateResult);
-
+            // The default query result reports one row for @@ROWCOUNT
             // Call the imported function directly
             const result = await update_table_records(args);
 
-            // Update connectToDb call check (will be updated further in Step 2)
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1); // Check it's called, args check later
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
+            expectSharedPoolUsedOnce();
             // Check query structure
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`UPDATE [${args.table_name}] SET [City] = @setParam0, [Status] = @setParam1 WHERE [CustomerID] = @filterParam2`));
-            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`SELECT @@ROWCOUNT AS RowsAffected;`));
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(ROWCOUNT_SQL));
             // Check parameter binding
             expect(mockRequest.input).toHaveBeenCalledWith('setParam0', 'New York');
             expect(mockRequest.input).toHaveBeenCalledWith('setParam1', 'Active');
             expect(mockRequest.input).toHaveBeenCalledWith('filterParam2', 123);
 
             expect(result).toEqual({ status: 'Success', updated_count: 1 });
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
         });
 
         it('should return error if filters are missing or empty', async () => {
@@ -537,59 +579,31 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             await expect(update_table_records({ ...args, filters: {} })).rejects.toThrow('Filters are required');
             // expect(resultNoFilters.status).toBe('Error');
             // expect(resultNoFilters.message).toContain('Filters are required');
-            expect(mockedDb.connectToDb).not.toHaveBeenCalled();
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
 
             // Call the imported function directly - expect it to throw
             await expect(update_table_records({ ...args, filters: null as any })).rejects.toThrow('Filters are required');
             // expect(resultNullFilters.status).toBe('Error');
             // expect(resultNullFilters.message).toContain('Filters are required');
-            expect(mockedDb.connectToDb).not.toHaveBeenCalled();
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
         });
 
         it('should return success with 0 count if updates are missing or empty', async () => {
             // Call the imported function directly
             const resultNoUpdates = await update_table_records({ ...args, updates: {} });
             expect(resultNoUpdates).toEqual({ status: 'Success', updated_count: 0, message: 'No update values provided.' });
-            expect(mockedDb.connectToDb).not.toHaveBeenCalled();
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
 
             // Call the imported function directly
             const resultNullUpdates = await update_table_records({ ...args, updates: null as any });
             expect(resultNullUpdates).toEqual({ status: 'Success', updated_count: 0, message: 'No update values provided.' });
-            expect(mockedDb.connectToDb).not.toHaveBeenCalled();
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
         });
 
 
-        it('should handle query errors and close pool', async () => {
-            const queryError = new Error('Update Query Failed');
-            mockQueryFn.mockRejectedValue(queryError);
-
-            // Call the imported function directly - expect it to throw
-            await expect(update_table_records(args)).rejects.toThrow('Update Query Failed');
-            // const result = await serverInstance.update_table_records(args);
-
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1);
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
-            expect(mockQueryFn).toHaveBeenCalledTimes(1);
-            // expect(result.status).toBe('Error');
-            // expect(result.updated_count).toBe(0);
-            // expect(result.message).toContain('Update Query Failed');
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
-        });
-
         // Remove profile/password not found tests for now
         // it('should return error if profile not found', async () => { ... });
         // it('should return error if password not found', async () => { ... });
-
-          it('should return error if connectToDb fails', async () => {
-              const connectError = new Error('DB Connect Failed');
-              mockedDb.connectToDb.mockRejectedValue(connectError);
-              // Call the imported function directly - expect it to throw
-              await expect(update_table_records(args)).rejects.toThrow('DB Connect Failed');
-              // const result = await serverInstance.update_table_records(args);
-              // expect(result.status).toBe('Error');
-              // expect(result.message).toContain('DB Connect Failed');
-              expect(mockPool.close).not.toHaveBeenCalled();
-          });
     });
 
     describe('delete_table_records', () => {
@@ -624,18 +638,42 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             // Call the imported function directly
             const result = await delete_table_records(args);
 
-            // Update connectToDb call check (will be updated further in Step 2)
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1); // Check it's called, args check later
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
+            expectSharedPoolUsedOnce();
             // Check query structure
             expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`DELETE FROM [${args.table_name}] WHERE [LogLevel] = @filterParam0 AND [Timestamp] = @filterParam1`));
-            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(`SELECT @@ROWCOUNT AS RowsAffected;`));
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining(ROWCOUNT_SQL));
             // Check parameter binding
             expect(mockRequest.input).toHaveBeenCalledWith('filterParam0', 'Error');
             expect(mockRequest.input).toHaveBeenCalledWith('filterParam1', '2023-10-27');
 
             expect(result).toEqual({ status: 'Success', deleted_count: 5 });
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
+        });
+
+        it('should reuse the same DELETE text for repeated filter shapes', async () => {
+            await delete_table_records(args);
+            await delete_table_records({ ...args, filters: { LogLevel: 'Info', Timestamp: '2023-10-28' } });
+
+            expect(mockQueryFn.mock.calls[0][0]).toBe(mockQueryFn.mock.calls[1][0]);
+            expect(mockRequest.input).toHaveBeenCalledWith('filterParam0', 'Info');
+        });
+
+        it('should replay the DELETE when chosen as a deadlock victim', async () => {
+            const mockRecordSet = createMockRecordSet([{ RowsAffected: 2 }]);
+            mockQueryFn
+                .mockRejectedValueOnce(Object.assign(new Error('Transaction was deadlocked'), { number: 1205 }))
+                .mockResolvedValueOnce({ recordsets: [mockRecordSet], recordset: mockRecordSet, rowsAffected: [], output: {} });
+
+            const result = await delete_table_records(args);
+
+            expect(mockQueryFn).toHaveBeenCalledTimes(2);
+            expect(result).toEqual({ status: 'Success', deleted_count: 2 });
+        });
+
+        it('should not retry errors other than deadlocks', async () => {
+            mockQueryFn.mockRejectedValueOnce(Object.assign(new Error('Permission denied'), { number: 229 }));
+
+            await expect(delete_table_records(args)).rejects.toThrow('Permission denied');
+            expect(mockQueryFn).toHaveBeenCalledTimes(1);
         });
 
         it('should return error if filters are missing or empty', async () => {
@@ -643,45 +681,115 @@ describe('MSSQL Tool Functions', () => { // Rename describe block
             await expect(delete_table_records({ ...args, filters: {} })).rejects.toThrow('Filters are required');
             // expect(resultNoFilters.status).toBe('Error');
             // expect(resultNoFilters.message).toContain('Filters are required');
-            expect(mockedDb.connectToDb).not.toHaveBeenCalled();
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
 
             // Call the imported function directly - expect it to throw
             await expect(delete_table_records({ ...args, filters: null as any })).rejects.toThrow('Filters are required');
             // expect(resultNullFilters.status).toBe('Error');
             // expect(resultNullFilters.message).toContain('Filters are required');
-            expect(mockedDb.connectToDb).not.toHaveBeenCalled();
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
         });
 
-        it('should handle query errors and close pool', async () => {
-            const queryError = new Error('Delete Query Failed');
-            mockQueryFn.mockRejectedValue(queryError);
+        // Remove profile/password not found tests for now
+        // it('should return error if profile not found', async () => { ... });
+        // it('should return error if password not found', async () => { ... });
+    });
+    describe('delete_table_records_batch', () => {
+        const operations = [
+            { table_name: 'Logs', filters: { LogLevel: 'Error' } },
+            { table_name: 'Audit', filters: { UserId: 7 } },
+        ];
+        let beginSpy: jest.SpyInstance;
+        let commitSpy: jest.SpyInstance;
+        let rollbackSpy: jest.SpyInstance;
+        let requestSpy: jest.SpyInstance;
 
-            // Call the imported function directly - expect it to throw
-            await expect(delete_table_records(args)).rejects.toThrow('Delete Query Failed');
-            // const result = await serverInstance.delete_table_records(args);
+        beforeEach(() => {
+            beginSpy = jest.spyOn(sql.Transaction.prototype, 'begin').mockResolvedValue(undefined as any);
+            commitSpy = jest.spyOn(sql.Transaction.prototype, 'commit').mockResolvedValue(undefined as any);
+            rollbackSpy = jest.spyOn(sql.Transaction.prototype, 'rollback').mockResolvedValue(undefined as any);
+            requestSpy = jest.spyOn(sql.Transaction.prototype, 'request').mockReturnValue(mockRequest);
+        });
+
+        afterEach(() => {
+            [beginSpy, commitSpy, rollbackSpy, requestSpy].forEach(spy => spy.mockRestore());
+        });
+
+        it('should run every DELETE in one round trip inside one transaction and sum the counts', async () => {
+            const counts = [createMockRecordSet([{ RowsAffected: 2 }]), createMockRecordSet([{ RowsAffected: 1 }])];
+            mockQueryFn.mockResolvedValueOnce({ recordsets: counts, recordset: counts[0], rowsAffected: [], output: {} });
+
+            const result = await delete_table_records_batch({ operations });
 
-            expect(mockedDb.connectToDb).toHaveBeenCalledTimes(1);
-            expect(mockPool.request).toHaveBeenCalledTimes(1);
+            expect(beginSpy).toHaveBeenCalledTimes(1);
             expect(mockQueryFn).toHaveBeenCalledTimes(1);
-            // expect(result.status).toBe('Error');
-            // expect(result.deleted_count).toBe(0);
-            // expect(result.message).toContain('Delete Query Failed');
-            expect(mockPool.close).toHaveBeenCalledTimes(1);
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining('DELETE FROM [Logs] WHERE [LogLevel] = @filterParam0'));
+            expect(mockQueryFn).toHaveBeenCalledWith(expect.stringContaining('DELETE FROM [Audit] WHERE [UserId] = @filterParam1'));
+            expect(mockRequest.input).toHaveBeenCalledWith('filterParam0', 'Error');
+            expect(mockRequest.input).toHaveBeenCalledWith('filterParam1', 7);
+            expect(commitSpy).toHaveBeenCalledTimes(1);
+            expect(rollbackSpy).not.toHaveBeenCalled();
+            expect(result).toEqual({ status: 'Success', deleted_count: 3, deleted_counts: [2, 1] });
         });
 
-        // Remove profile/password not found tests for now
-        // it('should return error if profile not found', async () => { ... });
-        // it('should return error if password not found', async () => { ... });
+        it('should roll back when any DELETE fails', async () => {
+            mockQueryFn.mockRejectedValueOnce(new Error('Delete failed'));
+
+            await expect(delete_table_records_batch({ operations })).rejects.toThrow('Delete failed');
+            expect(commitSpy).not.toHaveBeenCalled();
+            expect(rollbackSpy).toHaveBeenCalledTimes(1);
+        });
+
+        it('should split the batch before reaching the request parameter limit', async () => {
+            // 1049 operations x 2 filters = 2098 parameters fit one request; the 1050th starts a second
+            const wide = Array.from({ length: 1050 }, (_, i) => ({ table_name: 'Logs', filters: { LogLevel: 'Error', Id: i } }));
+            mockQueryFn.mockResolvedValue({ recordsets: [], recordset: createMockRecordSet([]), rowsAffected: [], output: {} });
+
+            await delete_table_records_batch({ operations: wide });
+
+            expect(mockQueryFn).toHaveBeenCalledTimes(2);
+        });
+
+        it('should reject an operation with more filters than one request can carry', async () => {
+            const filters = Object.fromEntries(Array.from({ length: 2099 }, (_, i) => [`Col${i}`, i]));
+            await expect(delete_table_records_batch({ operations: [{ table_name: 'Logs', filters }] }))
+                .rejects.toThrow('Operation 0 has 2099 filters');
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
+        });
+
+        it('should reject an operation without filters before connecting', async () => {
+            await expect(delete_table_records_batch({ operations: [operations[0], { table_name: 'Logs', filters: {} }] }))
+                .rejects.toThrow('operation 1 has none');
+            expect(mockedDb.getPool).not.toHaveBeenCalled();
+        });
+    });
+
+    // --- Failure paths shared by every tool ---
+    describe('error handling', () => {
+        // [tool name, call with valid args, the mssql call that runs the statement]
+        const TOOL_CASES: [string, () => Promise<unknown>, jest.Mock][] = [
+            ['list_tables', () => list_tables({}), mockQueryFn],
+            ['get_table_schema', () => get_table_schema({ table_name: 'Users' }), mockQueryFn],
+            ['describe_database', () => describe_database({}), mockQueryFn],
+            ['read_table_rows', () => read_table_rows({ table_name: 'Users' }), mockQueryFn],
+            ['create_table_records', () => create_table_records({ table_name: 'Users', records: [{ Name: 'Alice' }] }), mockBulkFn],
+            ['update_table_records', () => update_table_records({ table_name: 'Users', updates: { Name: 'Bob' }, filters: { Id: 1 } }), mockQueryFn],
+            ['delete_table_records', () => delete_table_records({ table_name: 'Users', filters: { Id: 1 } }), mockQueryFn],
+        ];
 
-          it('should return error if connectToDb fails', async () => {
-              const connectError = new Error('DB Connect Failed');
-              mockedDb.connectToDb.mockRejectedValue(connectError);
-              // Call the imported function directly - expect it to throw
-              await expect(delete_table_records(args)).rejects.toThrow('DB Connect Failed');
-              // const result = await serverInstance.delete_table_records(args);
-              // expect(result.status).toBe('Error');
-              // expect(result.message).toContain('DB Connect Failed');
-              expect(mockPool.close).not.toHaveBeenCalled();
-          });
+        it.each(TOOL_CASES)('%s should rethrow when getPool fails', async (_name, run, statementFn) => {
+            mockedDb.getPool.mockRejectedValueOnce(new Error('DB Connect Failed'));
+
+            await expect(run()).rejects.toThrow('DB Connect Failed');
+            expect(statementFn).not.toHaveBeenCalled();
+        });
+
+        it.each(TOOL_CASES)('%s should rethrow query errors without closing the shared pool', async (_name, run, statementFn) => {
+            statementFn.mockRejectedValueOnce(new Error('Query Failed'));
+
+            await expect(run()).rejects.toThrow('Query Failed');
+            expectSharedPoolUsedOnce();
+            expect(statementFn).toHaveBeenCalledTimes(1);
+        });
     });
-});
\ No newline at end of file
+});
@@ -14,7 +14,7 @@ dotenv.config();
 // Keep other imports
 import sql from 'mssql';
 // Removed profileManager imports
-import { connectToDb, closePool } from './db.js';
+import { getPool, closeSharedPool } from './db.js';
 
 // Check if running in MCP mode
 const isMcpMode = process.argv.includes('--stdio');
@@ -42,11 +42,16 @@ const logger = {
       console.error(`[ERROR] ${msg} ${err ? JSON.stringify(err) : ''}`);
     }
   },
-  debug: (msg: string) => {
-    if (!isMcpMode && process.env.DEBUG === 'true') {
-      console.debug(msg);
-    } else if (isMcpMode && process.env.DEBUG === 'true') {
-      console.error(`[DEBUG] ${msg}`);
+  // Accepts a thunk so callers can skip building the message when DEBUG is off
+  debug: (msg: string | (() => string)) => {
+    if (process.env.DEBUG !== 'true') {
+      return;
+    }
+    const text = typeof msg === 'function' ? msg() : msg;
+    if (!isMcpMode) {
+      console.debug(text);
+    } else {
+      console.error(`[DEBUG] ${text}`);
     }
   }
 };
@@ -63,6 +68,10 @@ interface GetTableSchemaArgs {
     schema?: string; // Schema remains optional
 }
 
+interface DescribeDatabaseArgs {
+    schema?: string; // Schema remains optional
+}
+
 interface ReadTableRowsArgs {
     table_name: string;
     columns?: string[];
@@ -88,6 +97,10 @@ interface DeleteTableRecordsArgs {
     filters: Record<string, any>;
 }
 
+interface DeleteTableRecordsBatchArgs {
+    operations: DeleteTableRecordsArgs[];
+}
+
 // Tool schemas for SDK - Profile management tools removed
 const toolSchemas = {
     list_tables: {
@@ -109,6 +122,14 @@ const toolSchemas = {
         required: ['table_name'], // profile_name removed
         title: 'get_table_schemaArguments'
     },
+    describe_database: {
+        type: 'object',
+        properties: {
+            schema: { type: 'string', nullable: true },
+        },
+        required: [],
+        title: 'describe_databaseArguments'
+    },
     read_table_rows: {
         type: 'object',
         properties: {
@@ -153,6 +174,27 @@ const toolSchemas = {
         },
         required: ['table_name', 'filters'], // profile_name removed
         title: 'delete_table_recordsArguments'
+    },
+    delete_table_records_batch: {
+        type: 'object',
+        properties: {
+            operations: {
+                type: 'array',
+                items: {
+                    type: 'object',
+                    properties: { table_name: { type: 'string' }, filters: { type: 'object' } },
+                    required: ['table_name', 'filters']
+                }
+            },
+        },
+        required: ['operations'],
+        title: 'delete_table_records_batchArguments'
+    },
+    invalidate_schema_cache: {
+        type: 'object',
+        properties: {},
+        required: [],
+        title: 'invalidate_schema_cacheArguments'
     }
 };
 
@@ -183,6 +225,19 @@ const toolDescriptions = {
     Raises:
         Error: If a database connection or query error occurs, or table name invalid.
     `,
+    describe_database: `
+    Retrieves the columns of every user table in one query, instead of list_tables followed by
+    get_table_schema per table.
+
+    Args:
+        schema: Optional schema name to filter tables by (e.g., 'dbo').
+
+    Returns:
+        A dictionary mapping each 'schema.table' name to its list of column dictionaries (as from get_table_schema).
+
+    Raises:
+        Error: If a database connection or query error occurs.
+    `,
     read_table_rows: `
     Reads rows from a specified table using the environment-configured connection, with advanced filtering.
 
@@ -201,12 +256,15 @@ const toolDescriptions = {
                      "Name": {"operator": "LIKE", "value": "J%"}
                  }
         limit: Optional maximum number of rows to return. Requires \`order_by\` for reliable pagination.
+               Capped at MSSQL_MAX_ROWS when that environment variable is set.
         offset: Optional number of rows to skip. Requires \`order_by\` for reliable pagination.
         order_by: Optional dictionary for sorting. Keys are column names (must be valid SQL identifiers),
                   values are direction ('ASC' or 'DESC'). Case-insensitive.
                   Example: {"RegistrationDate": "DESC", "Name": "ASC"}
     Returns:
         A list of dictionaries, where each dictionary represents a row. Column names are keys.
+        When MSSQL_MAX_ROWS is set, a read without a limit (or with a larger one) returns at most that
+        many rows. If you get exactly that many, the result may be partial: page with limit/offset/order_by.
 
     Raises:
         Error: If a database connection or query error occurs, table/column names invalid, filter structure invalid, or unsupported operator used.
@@ -250,19 +308,229 @@ const toolDescriptions = {
 
     Raises:
         Error: If a database connection or query error occurs, table name invalid, or filters empty/invalid.
+    `,
+    delete_table_records_batch: `
+    Deletes records for several filter sets in a single transaction with one commit.
+    Either every delete is applied or, if any fails, none are.
+
+    Args:
+        operations: A list of {table_name, filters} objects, each as for delete_table_records.
+                    Every operation requires at least one filter.
+
+    Returns:
+        A dictionary containing the status, the total number of records deleted, and the count per operation.
+
+    Raises:
+        Error: If a database connection or query error occurs, a table name is invalid, or operations/filters are empty.
+    `,
+    invalidate_schema_cache: `
+    Clears the cached results of list_tables, get_table_schema and describe_database.
+    Those results are cached for five minutes; call this after changing tables or columns.
+
+    Returns:
+        A dictionary containing the status and the number of cache entries cleared.
     `
 };
 
 /**
- * Helper function to safely close a connection pool and log errors.
+ * Returns the cached value for `key`, computing and storing it on a miss.
+ * The cache is cleared once it reaches `maxSize` so memory stays bounded.
+ * A `compute` that throws stores nothing.
  */
-async function closePoolSafely(pool: sql.ConnectionPool | null, context: string): Promise<void> {
-    if (pool && pool.connected) {
+function memoize<T>(cache: Map<string, T>, maxSize: number, key: string, compute: () => T): T {
+    let value = cache.get(key);
+    if (value === undefined) {
+        value = compute();
+        if (cache.size >= maxSize) {
+            cache.clear();
+        }
+        cache.set(key, value);
+    }
+    return value;
+}
+
+// Upper bound on entries in each of the SQL text caches below
+const MAX_CACHED_QUERIES = 256;
+
+// Identifiers are sysname (nvarchar(128)); any such name is valid once delimited
+const MAX_IDENTIFIER_LENGTH = 128;
+// Memoized quoteIdentifier results; the same table/column names recur across calls
+const quotedIdentifiers = new Map<string, string>();
+const MAX_QUOTED_IDENTIFIERS = 4096;
+
+/**
+ * Returns a table or column name as a delimited identifier for use in SQL text. Any ']' is
+ * doubled, so names like `Order Details` or `my-table` work and cannot break out of the brackets.
+ * @throws Error if the name is empty, not a string, or longer than 128 characters.
+ */
+function quoteIdentifier(name: string): string {
+    return memoize(quotedIdentifiers, MAX_QUOTED_IDENTIFIERS, name, () => {
+        if (typeof name !== 'string' || name.length === 0 || name.length > MAX_IDENTIFIER_LENGTH) {
+            throw new Error(`Invalid SQL identifier: "${name}"`);
+        }
+        return `[${name.replace(/]/g, ']]')}]`;
+    });
+}
+
+/**
+ * Builds `[a] = @filterParamN AND [b] = @filterParamN+1 ...` for update/delete filters,
+ * numbering parameters from `firstParam`.
+ * @throws Error if any column name is not a valid SQL identifier.
+ */
+function buildEqualityWhere(columns: string[], firstParam: number): string {
+    return columns.map((col, i) => `${quoteIdentifier(col)} = @filterParam${firstParam + i}`).join(' AND ');
+}
+
+// UPDATE/DELETE statements built by buildUpdateQuery/buildDeleteQuery, keyed by table and column lists
+const writeQueries = new Map<string, string>();
+
+/**
+ * Builds the parameterized UPDATE statement for the given SET and filter columns.
+ * SET values bind to @setParam0.., filters to @filterParamN.. numbered after them.
+ * @throws Error if the table or any column name is not a valid SQL identifier.
+ */
+function buildUpdateQuery(table: string, setColumns: string[], filterColumns: string[]): string {
+    return memoize(writeQueries, MAX_CACHED_QUERIES, JSON.stringify(['update', table, setColumns, filterColumns]), () => {
+        const setClause = setColumns.map((col, i) => `${quoteIdentifier(col)} = @setParam${i}`).join(', ');
+        const whereClause = buildEqualityWhere(filterColumns, setColumns.length);
+        return `UPDATE ${quoteIdentifier(table)} SET ${setClause} WHERE ${whereClause}; SELECT @@ROWCOUNT AS RowsAffected;`;
+    });
+}
+
+/**
+ * Builds the parameterized DELETE statement for the given filter columns (@filterParam0..).
+ * @throws Error if the table or any column name is not a valid SQL identifier.
+ */
+function buildDeleteQuery(table: string, filterColumns: string[]): string {
+    return memoize(writeQueries, MAX_CACHED_QUERIES, JSON.stringify(['delete', table, filterColumns]), () =>
+        `DELETE FROM ${quoteIdentifier(table)} WHERE ${buildEqualityWhere(filterColumns, 0)}; SELECT @@ROWCOUNT AS RowsAffected;`
+    );
+}
+
+/**
+ * Builds a DELETE statement whose filters bind to @filterParamN.. from `firstParam`, so several
+ * statements can share one batch. Not cached: the offset depends on the statement's batch position.
+ * @throws Error if the table or any column name is not a valid SQL identifier.
+ */
+function buildBatchedDelete(table: string, filterColumns: string[], firstParam: number): string {
+    return `DELETE FROM ${quoteIdentifier(table)} WHERE ${buildEqualityWhere(filterColumns, firstParam)}; SELECT @@ROWCOUNT AS RowsAffected;`;
+}
+
+// SQL Server accepts at most 2100 parameters per request; mssql sends parameterized text through
+// sp_executesql, whose own @stmt and @params arguments count toward that limit
+const MAX_PARAMS_PER_REQUEST = 2098;
+
+// read_table_rows operators bound as a plain `column <op> @param` comparison
+const COMPARISON_OPERATORS: ReadonlySet<string> = new Set(['=', '>', '<', '>=', '<=', '!=', '<>']);
+
+// One read_table_rows filter: column, operator, parameter name, and IN-list length (0 otherwise)
+type FilterShape = [column: string, operator: string, param: string, inCount: number];
+
+// Everything that determines the SQL text of a read_table_rows query, independent of parameter values
+interface SelectShape {
+    table: string;
+    columns: string[];
+    filters: FilterShape[];
+    orderBy: [string, 'ASC' | 'DESC'][];
+    top: boolean;
+    paginate: boolean;
+    fetch: boolean;
+}
+
+// SELECT statements built by buildSelectQuery, keyed by their serialized shape
+const selectQueries = new Map<string, string>();
+
+/**
+ * Builds the parameterized SELECT statement for a read_table_rows shape.
+ * Statements are cached per shape, so repeated calls only rebind parameter values.
+ * @throws Error if the table or any column name is not a valid SQL identifier.
+ */
+function buildSelectQuery(shape: SelectShape): string {
+    return memoize(selectQueries, MAX_CACHED_QUERIES, JSON.stringify(shape), () => {
+        const selectColumns = shape.columns.length > 0 ? shape.columns.map(quoteIdentifier).join(', ') : '*';
+        let query = `SELECT ${shape.top ? 'TOP (@top) ' : ''}${selectColumns} FROM ${quoteIdentifier(shape.table)}`;
+
+        if (shape.filters.length > 0) {
+            const filterClauses = shape.filters.map(([column, operator, param, inCount]) => {
+                if (operator === 'IN') {
+                    const inParams = Array.from({ length: inCount }, (_, i) => `@${param}_${i}`);
+                    return `${quoteIdentifier(column)} IN (${inParams.join(', ')})`;
+                }
+                return `${quoteIdentifier(column)} ${operator} @${param}`;
+            });
+            query += ` WHERE ${filterClauses.join(' AND ')}`;
+        }
+
+        if (shape.orderBy.length > 0) {
+            query += ` ORDER BY ${shape.orderBy.map(([column, direction]) => `${quoteIdentifier(column)} ${direction}`).join(', ')}`;
+        } else if (shape.paginate) {
+            query += ` ORDER BY (SELECT 1)`;
+        }
+
+        if (shape.paginate) {
+            query += ` OFFSET @offset ROWS`;
+            if (shape.fetch) {
+                query += ` FETCH NEXT @fetch ROWS ONLY`;
+            }
+        }
+        return query + ';';
+    });
+}
+
+// Catalog results from list_tables/get_table_schema/describe_database, kept for SCHEMA_CACHE_TTL_MS since schemas rarely change
+const SCHEMA_CACHE_TTL_MS = 5 * 60 * 1000;
+const MAX_SCHEMA_CACHE_ENTRIES = 512;
+const schemaCache = new Map<string, { expiresAt: number; value: any }>();
+
+/**
+ * Returns the unexpired cached result for `key`, or runs `load` and caches its result.
+ * Failed loads are not cached.
+ */
+async function cachedCatalogQuery<T>(key: string, load: () => Promise<T>): Promise<T> {
+    const cached = schemaCache.get(key);
+    if (cached && cached.expiresAt > Date.now()) {
+        return cached.value as T;
+    }
+    const value = await load();
+    if (schemaCache.size >= MAX_SCHEMA_CACHE_ENTRIES) {
+        schemaCache.clear();
+    }
+    schemaCache.set(key, { expiresAt: Date.now() + SCHEMA_CACHE_TTL_MS, value });
+    return value;
+}
+
+/**
+ * Applies the optional MSSQL_MAX_ROWS cap to a requested row count.
+ * Returns undefined when neither a limit nor a cap applies.
+ */
+function capRowCount(limit: number | undefined): number | undefined {
+    const maxRows = parseInt(process.env.MSSQL_MAX_ROWS ?? '', 10);
+    if (!Number.isNaN(maxRows) && maxRows > 0 && (limit === undefined || limit > maxRows)) {
+        return maxRows;
+    }
+    return limit;
+}
+
+// SQL Server error number for "chosen as the deadlock victim"; the victim's work is rolled back
+const DEADLOCK_ERROR_NUMBER = 1205;
+const MAX_DEADLOCK_ATTEMPTS = 3;
+const DEADLOCK_RETRY_BASE_MS = 50;
+
+/**
+ * Runs `attempt`, replaying it with exponential backoff when SQL Server picks it as a deadlock
+ * victim. Only for statements that are safe to replay as a whole (e.g. filtered deletes).
+ */
+async function withDeadlockRetry<T>(label: string, attempt: () => Promise<T>): Promise<T> {
+    for (let attemptNo = 1; ; attemptNo++) {
         try {
-            await pool.close();
-            logger.info(`Connection pool closed for ${context}.`);
-        } catch (closeErr: any) {
-            logger.error(`Error closing pool for ${context}:`, closeErr);
+            return await attempt();
+        } catch (error: any) {
+            if (error?.number !== DEADLOCK_ERROR_NUMBER || attemptNo >= MAX_DEADLOCK_ATTEMPTS) {
+                throw error;
+            }
+            const delayMs = DEADLOCK_RETRY_BASE_MS * 2 ** (attemptNo - 1);
+            logger.warn(`${label}: deadlock on attempt ${attemptNo}, retrying in ${delayMs} ms.`);
+            await new Promise(resolve => setTimeout(resolve, delayMs));
         }
     }
 }
@@ -274,30 +542,26 @@ async function closePoolSafely(pool: sql.ConnectionPool | null, context: string)
  * Lists user tables in the database.
  */
 export async function list_tables(args: ListTablesArgs): Promise<string[]> {
-    logger.debug(`Listing tables, schema: ${args.schema ?? 'all'}`);
-    let pool: sql.ConnectionPool | null = null;
+    const startedAt = Date.now();
     try {
-        // Removed profile loading and password retrieval
-        pool = await connectToDb(); // Call connectToDb without args
-        if (!pool) { // Add null check for type safety
-            throw new Error('Database connection pool could not be established.');
-        }
-        const request = pool.request();
-        let query = `SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE'`;
-        if (args.schema) {
-            query += ` AND TABLE_SCHEMA = @schema`;
-            request.input('schema', sql.NVarChar, args.schema);
-        }
-        query += ` ORDER BY TABLE_NAME;`;
-        const result = await request.query(query);
-        const tableNames = result.recordset.map(row => row.TABLE_NAME);
-        logger.debug(`Found tables: ${tableNames.join(', ')}`);
+        const tableNames = await cachedCatalogQuery(JSON.stringify(['tables', args.schema ?? null]), async () => {
+            const pool = await getPool(); // Shared pool, reused across calls
+            const request = pool.request();
+            // sys.tables holds only user tables, so no TABLE_TYPE filter or view join is needed
+            let query = `SELECT name AS TABLE_NAME FROM sys.tables`;
+            if (args.schema) {
+                query += ` WHERE schema_id = SCHEMA_ID(@schema)`;
+                request.input('schema', sql.NVarChar, args.schema);
+            }
+            query += ` ORDER BY name;`;
+            const result = await request.query(query);
+            return result.recordset.map(row => row.TABLE_NAME as string);
+        });
+        logger.debug(() => `list_tables: ${tableNames.length} tables in schema ${args.schema ?? 'all'} in ${Date.now() - startedAt} ms.`);
         return tableNames;
     } catch (error: any) {
         logger.error(`Error in list_tables:`, error);
         throw error; // Re-throw the error to be handled by the caller/SDK
-    } finally {
-        await closePool(pool);
     }
 }
 
@@ -305,127 +569,166 @@ export async function list_tables(args: ListTablesArgs): Promise<string[]> {
  * Retrieves the schema for a specified table.
  */
 export async function get_table_schema(args: GetTableSchemaArgs): Promise<Record<string, any>[]> {
-    logger.debug(`Getting schema for table: ${args.schema ?? 'default'}.${args.table_name}`);
-    let pool: sql.ConnectionPool | null = null;
+    const startedAt = Date.now();
     try {
-        // Removed profile loading and password retrieval
-        pool = await connectToDb(); // Call connectToDb without args
-        if (!pool) { // Add null check for type safety
-            throw new Error('Database connection pool could not be established.');
-        }
-        const request = pool.request();
-        let query = `
-            SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, COLUMN_DEFAULT
-            FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_NAME = @table_name`;
-        request.input('table_name', sql.NVarChar, args.table_name);
-        if (args.schema) {
-            query += ` AND TABLE_SCHEMA = @schema`;
-            request.input('schema', sql.NVarChar, args.schema);
-        }
-        query += ` ORDER BY ORDINAL_POSITION;`;
-        const result = await request.query(query);
-        logger.debug(`Schema retrieved successfully for table "${args.table_name}"`);
-        return result.recordset;
+        const columns = await cachedCatalogQuery(JSON.stringify(['columns', args.schema ?? null, args.table_name]), async () => {
+            const pool = await getPool(); // Shared pool, reused across calls
+            const request = pool.request();
+            let query = `
+                SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, COLUMN_DEFAULT
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_NAME = @table_name`;
+            request.input('table_name', sql.NVarChar, args.table_name);
+            if (args.schema) {
+                query += ` AND TABLE_SCHEMA = @schema`;
+                request.input('schema', sql.NVarChar, args.schema);
+            }
+            query += ` ORDER BY ORDINAL_POSITION;`;
+            const result = await request.query(query);
+            return result.recordset;
+        });
+        logger.debug(() => `get_table_schema: ${columns.length} columns for "${args.schema ?? 'default'}.${args.table_name}" in ${Date.now() - startedAt} ms.`);
+        return columns;
     } catch (error: any) {
         logger.error(`Error in get_table_schema for table "${args.table_name}":`, error);
         throw error; // Re-throw the error
-    } finally {
-        await closePool(pool);
     }
 }
 
+/**
+ * Retrieves the columns of all user tables, grouped by schema-qualified table name, in a single query.
+ */
+export async function describe_database(args: DescribeDatabaseArgs): Promise<Record<string, Record<string, any>[]>> {
+    const startedAt = Date.now();
+    try {
+        const tables = await cachedCatalogQuery(JSON.stringify(['database', args.schema ?? null]), async () => {
+            const pool = await getPool(); // Shared pool, reused across calls
+            const request = pool.request();
+            let query = `
+                SELECT c.TABLE_SCHEMA, c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE, c.IS_NULLABLE, c.CHARACTER_MAXIMUM_LENGTH, c.NUMERIC_PRECISION, c.NUMERIC_SCALE, c.COLUMN_DEFAULT
+                FROM INFORMATION_SCHEMA.COLUMNS c
+                JOIN INFORMATION_SCHEMA.TABLES t
+                    ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME AND t.TABLE_TYPE = 'BASE TABLE'`;
+            if (args.schema) {
+                query += ` WHERE c.TABLE_SCHEMA = @schema`;
+                request.input('schema', sql.NVarChar, args.schema);
+            }
+            query += ` ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION;`;
+            const result = await request.query(query);
+
+            // Keyed by schema.table so same-named tables in different schemas stay apart;
+            // rows arrive ordered by schema and table, so each table's columns are contiguous
+            const grouped: Record<string, Record<string, any>[]> = {};
+            for (const { TABLE_SCHEMA, TABLE_NAME, ...column } of result.recordset) {
+                (grouped[`${TABLE_SCHEMA}.${TABLE_NAME}`] ??= []).push(column);
+            }
+            return grouped;
+        });
+        logger.debug(() => `describe_database: ${Object.keys(tables).length} tables in schema ${args.schema ?? 'all'} in ${Date.now() - startedAt} ms.`);
+        return tables;
+    } catch (error: any) {
+        logger.error(`Error in describe_database:`, error);
+        throw error; // Re-throw the error
+    }
+}
+
+/**
+ * Clears cached list_tables/get_table_schema/describe_database results, e.g. after DDL changes.
+ */
+export async function invalidate_schema_cache(): Promise<{ status: string; cleared_count: number }> {
+    const clearedCount = schemaCache.size;
+    schemaCache.clear();
+    logger.debug(`Schema cache cleared (${clearedCount} entries).`);
+    return { status: 'Success', cleared_count: clearedCount };
+}
+
 /**
  * Reads rows from a specified table with filtering and pagination.
  */
 export async function read_table_rows(args: ReadTableRowsArgs): Promise<Record<string, any>[]> {
-    logger.debug(`Reading rows from table: ${args.table_name}`);
-    let pool: sql.ConnectionPool | null = null;
+    const startedAt = Date.now();
     try {
-        // Removed profile loading and password retrieval
-        pool = await connectToDb(); // Call connectToDb without args
-        if (!pool) { // Add null check for type safety
-            throw new Error('Database connection pool could not be established.');
+        // Unbounded reads are capped server-side (MSSQL_MAX_ROWS) so large tables are never buffered in full
+        const paginate = args.limit != null || args.offset != null;
+        const requestedCount = args.limit != null && args.limit > 0 ? args.limit : undefined;
+        const fetchCount = capRowCount(requestedCount);
+        if (fetchCount !== requestedCount) {
+            logger.warn(`read_table_rows: ${requestedCount === undefined ? 'unbounded read' : `limit ${requestedCount}`} on "${args.table_name}" capped at MSSQL_MAX_ROWS=${fetchCount}; results may be partial, page with limit/offset.`);
         }
-        const request = pool.request();
-
-        const selectColumns = args.columns && args.columns.length > 0 ? args.columns.map(c => `[${c}]`).join(', ') : '*';
-        let query = `SELECT ${selectColumns} FROM [${args.table_name}]`;
 
-        const filterClauses: string[] = [];
+        // Collect filter shapes and their parameter values; the SQL text is built from the shapes.
+        // Nothing touches the pool until the query has been built (and its identifiers validated).
+        const filterShapes: FilterShape[] = [];
+        const params: [name: string, type: (() => sql.ISqlType) | undefined, value: any][] = [];
         let paramIndex = 0;
         if (args.filters) {
             for (const col in args.filters) {
                 if (Object.prototype.hasOwnProperty.call(args.filters, col)) {
                     const filter = args.filters[col];
                     const paramName = `filterParam${paramIndex++}`;
-                    let clause = `[${col}]`;
-                    switch (filter.operator.toUpperCase()) {
-                        case '=': case '>': case '<': case '>=': case '<=': case '!=': case '<>':
-                            clause += ` ${filter.operator} @${paramName}`;
-                            request.input(paramName, filter.value);
-                            break;
-                        case 'LIKE':
-                            clause += ` LIKE @${paramName}`;
-                            request.input(paramName, sql.NVarChar, filter.value);
-                            break;
-                        case 'IN':
-                            if (Array.isArray(filter.value) && filter.value.length > 0) {
-                                const inParams = filter.value.map((val, i) => {
-                                    const inParamName = `${paramName}_${i}`;
-                                    request.input(inParamName, val);
-                                    return `@${inParamName}`;
-                                });
-                                clause += ` IN (${inParams.join(', ')})`;
-                            } else {
-                                logger.warn(`Ignoring IN filter for column "${col}" due to invalid value: ${filter.value}`);
-                                clause = '';
-                            }
-                            break;
-                        default:
-                            logger.warn(`Unsupported filter operator "${filter.operator}" for column "${col}". Ignoring.`);
-                            clause = '';
+                    const operator = filter.operator.toUpperCase();
+                    if (COMPARISON_OPERATORS.has(operator)) {
+                        params.push([paramName, undefined, filter.value]);
+                        filterShapes.push([col, operator, paramName, 0]);
+                    } else if (operator === 'LIKE') {
+                        params.push([paramName, sql.NVarChar, filter.value]);
+                        filterShapes.push([col, 'LIKE', paramName, 0]);
+                    } else if (operator === 'IN') {
+                        if (Array.isArray(filter.value) && filter.value.length > 0) {
+                            filter.value.forEach((val, i) => params.push([`${paramName}_${i}`, undefined, val]));
+                            filterShapes.push([col, 'IN', paramName, filter.value.length]);
+                        } else {
+                            logger.warn(`Ignoring IN filter for column "${col}" due to invalid value: ${filter.value}`);
+                        }
+                    } else {
+                        logger.warn(`Unsupported filter operator "${filter.operator}" for column "${col}". Ignoring.`);
                     }
-                    if (clause) filterClauses.push(clause);
                 }
             }
         }
-        if (filterClauses.length > 0) query += ` WHERE ${filterClauses.join(' AND ')}`;
 
-        const orderClauses: string[] = [];
+        const orderShapes: [string, 'ASC' | 'DESC'][] = [];
         if (args.order_by) {
              for (const col in args.order_by) {
                  if (Object.prototype.hasOwnProperty.call(args.order_by, col)) {
-                     const direction = args.order_by[col].toUpperCase() === 'DESC' ? 'DESC' : 'ASC';
-                     orderClauses.push(`[${col}] ${direction}`);
+                     orderShapes.push([col, args.order_by[col].toUpperCase() === 'DESC' ? 'DESC' : 'ASC']);
                  }
              }
         }
-         if (orderClauses.length > 0) {
-             query += ` ORDER BY ${orderClauses.join(', ')}`;
-         } else if (args.limit != null || args.offset != null) {
-             logger.warn('Pagination (limit/offset) used without explicit ORDER BY. Ordering by (SELECT 1), which might be inefficient or non-deterministic.');
-             query += ` ORDER BY (SELECT 1)`;
-         }
-
-        if (args.limit != null || args.offset != null) {
-             const offsetCount = args.offset ?? 0;
-             query += ` OFFSET ${offsetCount} ROWS`;
-             if (args.limit != null && args.limit > 0) {
-                 query += ` FETCH NEXT ${args.limit} ROWS ONLY`;
-             }
+        if (orderShapes.length === 0 && paginate) {
+            logger.warn('Pagination (limit/offset) used without explicit ORDER BY. Ordering by (SELECT 1), which might be inefficient or non-deterministic.');
+        }
+
+        const shape: SelectShape = {
+            table: args.table_name,
+            columns: args.columns ?? [],
+            filters: filterShapes,
+            orderBy: orderShapes,
+            top: !paginate && fetchCount !== undefined,
+            paginate,
+            fetch: fetchCount !== undefined,
+        };
+        const query = buildSelectQuery(shape);
+
+        const pool = await getPool(); // Shared pool, reused across calls
+        const request = pool.request();
+        for (const [name, type, value] of params) {
+            if (type) {
+                request.input(name, type, value);
+            } else {
+                request.input(name, value); // Let mssql infer the type
+            }
         }
-        query += ';';
+        if (shape.top) request.input('top', sql.Int, fetchCount);
+        if (paginate) request.input('offset', sql.Int, args.offset ?? 0);
+        if (paginate && shape.fetch) request.input('fetch', sql.Int, fetchCount);
 
-        logger.debug(`Executing query: ${query}`);
         const result = await request.query(query);
-        logger.debug(`Read ${result.recordset.length} rows successfully.`);
+        logger.debug(() => `read_table_rows: ${result.recordset.length} rows from "${args.table_name}" in ${Date.now() - startedAt} ms. Query: ${query}`);
         return result.recordset;
     } catch (error: any) {
         logger.error(`Error in read_table_rows for table "${args.table_name}":`, error);
         throw error; // Re-throw the error
-    } finally {
-        await closePool(pool);
     }
 }
 
@@ -433,20 +736,32 @@ export async function read_table_rows(args: ReadTableRowsArgs): Promise<Record<s
  * Inserts one or more new records into the specified table.
  */
 export async function create_table_records(args: CreateTableRecordsArgs): Promise<{ status: string; inserted_count: number; message?: string }> {
-    logger.debug(`Creating ${args.records.length} records in table: ${args.table_name}`);
+    const startedAt = Date.now();
     if (!args.records || args.records.length === 0) {
         // Throw error instead of returning object for consistency
         throw new Error('No records provided to insert.');
     }
 
-    let pool: sql.ConnectionPool | null = null;
+    const firstRecord = args.records[0];
+    const columns = Object.keys(firstRecord);
+
+    // Every record must have exactly the columns of the first one; stop at the first mismatch
+    const columnSet = new Set(columns);
+    for (let r = 1; r < args.records.length; r++) {
+        const keys = Object.keys(args.records[r]);
+        if (keys.length !== columnSet.size || !keys.every(key => columnSet.has(key))) {
+            const msg = `Record at index ${r} does not have the same columns as the first record.`;
+            logger.error(`Error in create_table_records for table "${args.table_name}": ${msg}`);
+            throw new Error(msg);
+        }
+    }
+
     try {
-        // Removed profile loading and password retrieval
-        pool = await connectToDb(); // Call connectToDb without args
-        if (!pool) throw new Error('Database connection pool could not be established.');
+        // Validate the table and column names before touching the pool
+        const quotedTable = quoteIdentifier(args.table_name);
+        columns.forEach(col => quoteIdentifier(col));
 
-        const firstRecord = args.records[0];
-        const columns = Object.keys(firstRecord);
+        const pool = await getPool(); // Shared pool, reused across calls
 
         // Basic type inference helper
         const getSqlType = (value: any): sql.ISqlType => {
@@ -465,7 +780,7 @@ export async function create_table_records(args: CreateTableRecordsArgs): Promis
             return sql.NVarChar(sql.MAX);
         };
 
-        const table = new sql.Table(`[${args.table_name}]`);
+        const table = new sql.Table(quotedTable);
         table.create = false; // Assume table exists
 
         // Define columns based on the first record and inferred types
@@ -486,15 +801,13 @@ export async function create_table_records(args: CreateTableRecordsArgs): Promis
         const request = pool.request();
         const result = await request.bulk(table);
 
-        logger.debug(`Bulk insert successful. ${result.rowsAffected} records inserted into "${args.table_name}".`);
+        logger.debug(() => `create_table_records: ${result.rowsAffected} records inserted into "${args.table_name}" in ${Date.now() - startedAt} ms.`);
         return { status: 'Success', inserted_count: result.rowsAffected };
 
     } catch (error: any) {
         logger.error(`Error in create_table_records for table "${args.table_name}":`, error);
         // Re-throw the error for the SDK handler
         throw error;
-    } finally {
-        await closePool(pool);
     }
 }
 
@@ -502,7 +815,7 @@ export async function create_table_records(args: CreateTableRecordsArgs): Promis
  * Updates existing records in the specified table.
  */
 export async function update_table_records(args: UpdateTableRecordsArgs): Promise<{ status: string; updated_count: number; message?: string }> {
-    logger.debug(`Updating records in table: ${args.table_name}`);
+    const startedAt = Date.now();
 
     if (!args.filters || Object.keys(args.filters).length === 0) {
         const msg = 'Filters are required for update operations to prevent accidental full table updates.';
@@ -516,44 +829,29 @@ export async function update_table_records(args: UpdateTableRecordsArgs): Promis
         return { status: 'Success', updated_count: 0, message: 'No update values provided.' };
     }
 
-    let pool: sql.ConnectionPool | null = null;
     try {
-        // Removed profile loading and password retrieval
-        pool = await connectToDb(); // Call connectToDb without args
-        if (!pool) throw new Error('Database connection pool could not be established.');
+        const setColumns = Object.keys(args.updates);
+        const filterColumns = Object.keys(args.filters);
+        const query = buildUpdateQuery(args.table_name, setColumns, filterColumns); // Validates identifiers
 
+        const pool = await getPool(); // Shared pool, reused across calls
         const request = pool.request();
-        let paramIndex = 0;
-
-        // Build SET clause
-        const setClauses = Object.entries(args.updates).map(([col, value]) => {
-            const paramName = `setParam${paramIndex++}`;
-            request.input(paramName, value); // Let mssql infer type for updates
-            return `[${col}] = @${paramName}`;
-        });
-
-        // Build WHERE clause (assuming simple '=' filters)
-        const whereClauses = Object.entries(args.filters).map(([col, value]) => {
-            const paramName = `filterParam${paramIndex++}`;
-            request.input(paramName, value); // Let mssql infer type for filters
-            return `[${col}] = @${paramName}`;
-        });
 
-        const query = `UPDATE [${args.table_name}] SET ${setClauses.join(', ')} WHERE ${whereClauses.join(' AND ')}; SELECT @@ROWCOUNT AS RowsAffected;`;
+        // Bind SET values, then filter values numbered after them; let mssql infer the types
+        let paramIndex = 0;
+        setColumns.forEach(col => request.input(`setParam${paramIndex++}`, args.updates[col]));
+        filterColumns.forEach(col => request.input(`filterParam${paramIndex++}`, args.filters[col]));
 
-        logger.debug(`Executing query: ${query}`);
         const result = await request.query(query);
         const updatedCount = result.recordset[0]?.RowsAffected ?? 0; // @@ROWCOUNT returns result set
 
-        logger.debug(`Update successful. ${updatedCount} records updated in "${args.table_name}".`);
+        logger.debug(() => `update_table_records: ${updatedCount} records updated in "${args.table_name}" in ${Date.now() - startedAt} ms. Query: ${query}`);
         return { status: 'Success', updated_count: updatedCount };
 
     } catch (error: any) {
         logger.error(`Error in update_table_records for table "${args.table_name}":`, error);
         // Re-throw the error for the SDK handler
         throw error;
-    } finally {
-        await closePool(pool);
     }
 } // Added missing closing brace
 
@@ -561,7 +859,7 @@ export async function update_table_records(args: UpdateTableRecordsArgs): Promis
  * Deletes records from the specified table based on filter criteria.
  */
 export async function delete_table_records(args: DeleteTableRecordsArgs): Promise<{ status: string; deleted_count: number; message?: string }> {
-    logger.debug(`Deleting records from table: ${args.table_name}`);
+    const startedAt = Date.now();
 
     if (!args.filters || Object.keys(args.filters).length === 0) {
         const msg = 'Filters are required for delete operations to prevent accidental full table deletion.';
@@ -570,37 +868,105 @@ export async function delete_table_records(args: DeleteTableRecordsArgs): Promis
         throw new Error(msg);
     }
 
-    let pool: sql.ConnectionPool | null = null;
     try {
-        // Removed profile loading and password retrieval
-        pool = await connectToDb(); // Call connectToDb without args
-        if (!pool) throw new Error('Database connection pool could not be established.');
-
-        const request = pool.request();
-        let paramIndex = 0;
-
-        // Build WHERE clause (assuming simple '=' filters)
-        const whereClauses = Object.entries(args.filters).map(([col, value]) => {
-            const paramName = `filterParam${paramIndex++}`;
-            request.input(paramName, value); // Let mssql infer type for filters
-            return `[${col}] = @${paramName}`;
+        const filterColumns = Object.keys(args.filters);
+        const query = buildDeleteQuery(args.table_name, filterColumns); // Validates identifiers
+
+        const pool = await getPool(); // Shared pool, reused across calls
+        const result = await withDeadlockRetry('delete_table_records', () => {
+            const request = pool.request();
+            filterColumns.forEach((col, i) => request.input(`filterParam${i}`, args.filters[col])); // Let mssql infer type for filters
+            return request.query(query);
         });
-
-        const query = `DELETE FROM [${args.table_name}] WHERE ${whereClauses.join(' AND ')}; SELECT @@ROWCOUNT AS RowsAffected;`;
-
-        logger.debug(`Executing query: ${query}`);
-        const result = await request.query(query);
         const deletedCount = result.recordset[0]?.RowsAffected ?? 0;
 
-        logger.debug(`Delete successful. ${deletedCount} records deleted from "${args.table_name}".`);
+        logger.debug(() => `delete_table_records: ${deletedCount} records deleted from "${args.table_name}" in ${Date.now() - startedAt} ms. Query: ${query}`);
         return { status: 'Success', deleted_count: deletedCount };
 
     } catch (error: any) {
         logger.error(`Error in delete_table_records for table "${args.table_name}":`, error);
         // Re-throw the error for the SDK handler
         throw error;
-    } finally {
-        await closePool(pool);
+    }
+}
+
+/**
+ * Deletes records for several {table_name, filters} operations in one transaction.
+ */
+export async function delete_table_records_batch(args: DeleteTableRecordsBatchArgs): Promise<{ status: string; deleted_count: number; deleted_counts: number[] }> {
+    const startedAt = Date.now();
+
+    if (!args.operations || args.operations.length === 0) {
+        const msg = 'No delete operations provided.';
+        logger.error(`Error in delete_table_records_batch: ${msg}`);
+        throw new Error(msg);
+    }
+    const missingFilters = args.operations.findIndex(op => !op.filters || Object.keys(op.filters).length === 0);
+    if (missingFilters !== -1) {
+        const msg = `Filters are required for delete operations to prevent accidental full table deletion (operation ${missingFilters} has none).`;
+        logger.error(`Error in delete_table_records_batch: ${msg}`);
+        throw new Error(msg);
+    }
+    // Build (and validate) every statement before opening the transaction. Statements are packed
+    // into as few multi-statement requests as the parameter limit allows, one round trip each.
+    const batches: { query: string; values: any[] }[] = [];
+    let batch = { query: '', values: [] as any[] };
+    for (let i = 0; i < args.operations.length; i++) {
+        const op = args.operations[i];
+        const filterColumns = Object.keys(op.filters);
+        if (filterColumns.length > MAX_PARAMS_PER_REQUEST) {
+            const msg = `Operation ${i} has ${filterColumns.length} filters; at most ${MAX_PARAMS_PER_REQUEST} fit in one request.`;
+            logger.error(`Error in delete_table_records_batch: ${msg}`);
+            throw new Error(msg);
+        }
+        if (batch.values.length > 0 && batch.values.length + filterColumns.length > MAX_PARAMS_PER_REQUEST) {
+            batches.push(batch);
+            batch = { query: '', values: [] };
+        }
+        batch.query += buildBatchedDelete(op.table_name, filterColumns, batch.values.length) + '\n';
+        for (const col of filterColumns) {
+            batch.values.push(op.filters[col]);
+        }
+    }
+    batches.push(batch);
+
+    try {
+        const pool = await getPool(); // Shared pool, reused across calls
+        // A deadlock victim's transaction is already rolled back, so the whole batch can be replayed
+        const deletedCounts = await withDeadlockRetry('delete_table_records_batch', async () => {
+            const transaction = new sql.Transaction(pool);
+            await transaction.begin();
+            try {
+                const counts: number[] = [];
+                for (const { query, values } of batches) {
+                    const request = transaction.request();
+                    values.forEach((value, p) => request.input(`filterParam${p}`, value)); // Let mssql infer type for filters
+                    const result = await request.query(query);
+                    // Each DELETE is followed by its own SELECT @@ROWCOUNT, one recordset per operation
+                    for (const recordset of result.recordsets as sql.IRecordSet<any>[]) {
+                        counts.push(recordset[0]?.RowsAffected ?? 0);
+                    }
+                }
+                await transaction.commit();
+                return counts;
+            } catch (error: any) {
+                try {
+                    await transaction.rollback();
+                } catch (rollbackErr: any) {
+                    logger.error(`Error rolling back delete_table_records_batch:`, rollbackErr);
+                }
+                throw error;
+            }
+        });
+
+        const deletedCount = deletedCounts.reduce((total, count) => total + count, 0);
+        logger.debug(() => `delete_table_records_batch: ${deletedCount} records deleted by ${args.operations.length} operations in ${Date.now() - startedAt} ms.`);
+        return { status: 'Success', deleted_count: deletedCount, deleted_counts: deletedCounts };
+
+    } catch (error: any) {
+        logger.error(`Error in delete_table_records_batch:`, error);
+        // Re-throw the error for the SDK handler
+        throw error;
     }
 }
 
@@ -610,10 +976,13 @@ export async function delete_table_records(args: DeleteTableRecordsArgs): Promis
 const toolImplementations: Record<string, Function> = {
     list_tables,
     get_table_schema,
+    describe_database,
     read_table_rows,
     create_table_records,
     update_table_records,
     delete_table_records,
+    delete_table_records_batch,
+    invalidate_schema_cache,
 };
 
 async function main() {
@@ -662,9 +1031,19 @@ async function main() {
                             required: ["table_name"]
                         }
                     },
+                    {
+                        name: "describe_database",
+                        description: "Gets the columns of every table in one call, keyed by schema.table",
+                        inputSchema: {
+                            type: "object",
+                            properties: {
+                                schema: { type: "string", description: "Database schema name (optional)" }
+                            }
+                        }
+                    },
                     {
                         name: "read_table_rows",
-                        description: "Reads rows from a table with optional filtering and pagination",
+                        description: "Reads rows from a table with optional filtering and pagination. If the server sets MSSQL_MAX_ROWS, larger or unbounded reads are truncated to that many rows; page with limit/offset to read more",
                         inputSchema: {
                             type: "object",
                             properties: {
@@ -685,7 +1064,7 @@ async function main() {
                                     }, 
                                     description: "Filter conditions (optional)" 
                                 },
-                                limit: { type: "number", description: "Maximum number of rows to return (optional)" },
+                                limit: { type: "number", description: "Maximum number of rows to return (optional, capped at MSSQL_MAX_ROWS when set)" },
                                 offset: { type: "number", description: "Number of rows to skip (optional)" },
                                 order_by: { 
                                     type: "object", 
@@ -698,6 +1077,36 @@ async function main() {
                             },
                             required: ["table_name"]
                         }
+                    },
+                    {
+                        name: "delete_table_records_batch",
+                        description: "Deletes records for several {table_name, filters} operations in one transaction; either every delete is applied or none are",
+                        inputSchema: {
+                            type: "object",
+                            properties: {
+                                operations: {
+                                    type: "array",
+                                    items: {
+                                        type: "object",
+                                        properties: {
+                                            table_name: { type: "string", description: "Name of the table" },
+                                            filters: { type: "object", description: "Column/value pairs identifying the records to delete (at least one)" }
+                                        },
+                                        required: ["table_name", "filters"]
+                                    },
+                                    description: "Delete operations to apply together"
+                                }
+                            },
+                            required: ["operations"]
+                        }
+                    },
+                    {
+                        name: "invalidate_schema_cache",
+                        description: "Clears cached list_tables/get_table_schema/describe_database results (call after schema changes)",
+                        inputSchema: {
+                            type: "object",
+                            properties: {}
+                        }
                     }
                 ]
             };
@@ -706,25 +1115,23 @@ async function main() {
         // Register call-tool handler
         server.setRequestHandler(CallToolRequestSchema, async (request) => {
             try {
-                if (!request.params.arguments) {
-                    throw new Error("Arguments are required");
-                }
+                // Zero-argument tools may be called without an arguments object
+                const args: Record<string, unknown> = request.params.arguments ?? {};
 
+                // Results are serialized compactly: indentation only inflates large schema/row payloads
+                // for the client, which parses the JSON anyway
                 switch (request.params.name) {
                     case "list_tables": {
-                        const args = request.params.arguments as Record<string, unknown>;
-                        
                         // Create a typed object with only expected properties
                         const typedArgs: ListTablesArgs = { 
                             schema: typeof args.schema === 'string' ? args.schema : undefined
                         };
                         
                         const result = await list_tables(typedArgs);
-                        return { content: [{ type: "text", text: JSON.stringify(result, null, 2) }] };
+                        return { content: [{ type: "text", text: JSON.stringify(result) }] };
                     }
 
                     case "get_table_schema": {
-                        const args = request.params.arguments as Record<string, unknown>;
                         if (typeof args.table_name !== 'string') {
                             throw new Error("table_name is required and must be a string");
                         }
@@ -735,11 +1142,19 @@ async function main() {
                         };
                         
                         const result = await get_table_schema(typedArgs);
-                        return { content: [{ type: "text", text: JSON.stringify(result, null, 2) }] };
+                        return { content: [{ type: "text", text: JSON.stringify(result) }] };
+                    }
+
+                    case "describe_database": {
+                        const typedArgs: DescribeDatabaseArgs = {
+                            schema: typeof args.schema === 'string' ? args.schema : undefined
+                        };
+
+                        const result = await describe_database(typedArgs);
+                        return { content: [{ type: "text", text: JSON.stringify(result) }] };
                     }
 
                     case "read_table_rows": {
-                        const args = request.params.arguments as Record<string, unknown>;
                         if (typeof args.table_name !== 'string') {
                             throw new Error("table_name is required and must be a string");
                         }
@@ -755,7 +1170,29 @@ async function main() {
                         };
                         
                         const result = await read_table_rows(typedArgs);
-                        return { content: [{ type: "text", text: JSON.stringify(result, null, 2) }] };
+                        return { content: [{ type: "text", text: JSON.stringify(result) }] };
+                    }
+
+                    case "delete_table_records_batch": {
+                        const operations = args.operations;
+                        if (!Array.isArray(operations) || !operations.every(op =>
+                            typeof op === 'object' && op !== null &&
+                            typeof op.table_name === 'string' &&
+                            typeof op.filters === 'object' && op.filters !== null && !Array.isArray(op.filters))) {
+                            throw new Error("operations is required and must be an array of {table_name: string, filters: object}");
+                        }
+
+                        const typedArgs: DeleteTableRecordsBatchArgs = {
+                            operations: operations.map(op => ({ table_name: op.table_name, filters: op.filters }))
+                        };
+
+                        const result = await delete_table_records_batch(typedArgs);
+                        return { content: [{ type: "text", text: JSON.stringify(result) }] };
+                    }
+
+                    case "invalidate_schema_cache": {
+                        const result = await invalidate_schema_cache();
+                        return { content: [{ type: "text", text: JSON.stringify(result) }] };
                     }
 
                     default:
@@ -772,6 +1209,14 @@ async function main() {
         // Connect to stdio
         const transport = new StdioServerTransport();
         await server.connect(transport);
+
+        // Release the shared pool's connections when the host terminates the server
+        const shutdown = async () => {
+            await closeSharedPool();
+            process.exit(0);
+        };
+        process.on('SIGINT', shutdown);
+        process.on('SIGTERM', shutdown);
         
         if (process.env.DEBUG === 'true') {
             logger.error("MSSQL MCP Server running on stdio");